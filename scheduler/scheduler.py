@@ -1,51 +1,73 @@
+import logging
 import random
 from typing import Dict, List, Tuple, Callable, Optional, Set
-from collections import defaultdict
 
 DAYS = 5
 PERIODS = 7
 
+logger = logging.getLogger(__name__)
+
 Slot = Tuple[int, int]
 Timetable = List[List[Optional[str]]]
 TeacherAssignments = Dict[Slot, str]
 
+# Bit b = d * PERIODS + p represents slot (d, p).  A class's free slots and a
+# (subject, teacher) pair's busy slots each fit in a single 35-bit int, so
+# availability checks and free-slot iteration are plain integer bit ops.
+FULL_MASK = (1 << (DAYS * PERIODS)) - 1
+
+# Distance-from-midday penalty per period, fixed for PERIODS at import time
+_MIDDLE_PENALTY = tuple(abs(p - PERIODS // 2) * 0.2 for p in range(PERIODS))
+
+# Pre-drawn tie-breaking jitter for slot sorting.  A single random offset
+# into this pool replaces one random.random() call per cell; the pool is
+# long enough that offset + flat slot index never wraps.
+_JITTER_POOL = [random.random() for _ in range(DAYS * PERIODS + 64)]
+
+
+def slot_to_bit(day: int, period: int) -> int:
+    """Return the bitmask with only the bit for slot (day, period) set."""
+    return 1 << (day * PERIODS + period)
+
 
-def is_teacher_available(teacher_assignments_global, subject, slot, teacher_id):
+def is_teacher_available(teacher_busy_mask, subject, slot, teacher_id):
     """
     Check if a teacher is available at a given slot.
     Returns False if the teacher is already assigned to another class for this subject at this slot.
     """
-    return teacher_id not in teacher_assignments_global[subject][slot]
+    d, p = slot
+    return not teacher_busy_mask[subject][teacher_id] >> (d * PERIODS + p) & 1
 
 
-def count_teacher_workload(teacher_assignments_global, teacher_id):
+def count_teacher_workload(teacher_busy_mask, teacher_id):
     """
     Count how many slots a teacher is currently assigned across all subjects.
     Used to balance teacher workload.
     """
     count = 0
-    for subject, slots in teacher_assignments_global.items():
-        for slot, teachers in slots.items():
-            if teacher_id in teachers:
-                count += 1
+    for masks in teacher_busy_mask.values():
+        if teacher_id < len(masks):
+            count += masks[teacher_id].bit_count()
     return count
 
 
+def _score_contrib(count: int) -> float:
+    """A single day's contribution to the distribution score."""
+    if count <= 0:
+        return 0.0
+    return 1.0 - 0.2 * (count - 1)
+
+
 def calculate_distribution_score(timetable: Timetable, subject: str) -> float:
     """
     Calculate how well distributed a subject is across the week.
     Higher score means better distribution.
     """
-    # Count subject occurrences per day
-    day_counts = [0] * DAYS
-    for d in range(DAYS):
-        for p in range(PERIODS):
-            if timetable[d][p] == subject:
-                day_counts[d] += 1
-
-    # Penalize days with multiple sessions and reward even distribution
+    # Count subject occurrences per day (list.count runs in C, no per-cell
+    # bytecode) and reward even distribution while penalizing doubled days
     distribution_score = 0
-    for count in day_counts:
+    for row in timetable:
+        count = row.count(subject)
         if count > 0:
             # Reward for having the subject on this day
             distribution_score += 1
@@ -59,84 +81,244 @@ def calculate_distribution_score(timetable: Timetable, subject: str) -> float:
 def sort_slots_by_priority(
         timetable: Timetable,
         subject: str,
-        existing_assignment_slots: Set[Slot]
-) -> List[Slot]:
+        competition: Optional[List[int]] = None,
+        counts: Optional[Tuple[List[int], List[int], List[int]]] = None
+) -> List[int]:
     """
-    Sort slots by priority for better distribution:
+    Sort slots by priority, returned as flat d * PERIODS + p indices:
     1. Prioritize days without the subject
     2. Avoid consecutive periods
     3. Balance periods across the day (avoid early/late clusters)
     4. Add slight randomness for variety
-    """
-    # Count subject occurrences per day and period
-    day_counts = [0] * DAYS
-    period_counts = [0] * PERIODS
-    slots_per_day = [0] * DAYS  # Count total assigned slots per day
 
-    for d in range(DAYS):
-        for p in range(PERIODS):
-            if timetable[d][p] is not None:
-                slots_per_day[d] += 1
-                if timetable[d][p] == subject:
-                    day_counts[d] += 1
-                    period_counts[p] += 1
+    When given, ``competition`` holds per-slot counts of sibling classes
+    that still need the same teacher there; less contested slots are tried
+    first (least-constraining-value ordering).  ``counts`` lets a caller
+    that maintains the histograms incrementally (the backtracker updates
+    them by +-1 on each place/unplace) skip the full-grid recount.
+    """
+    if counts is not None:
+        day_counts, period_counts, slots_per_day = counts
+    else:
+        # Count subject occurrences per day and period
+        day_counts = [0] * DAYS
+        period_counts = [0] * PERIODS
+        slots_per_day = [0] * DAYS  # Count total assigned slots per day
+
+        for d, row in enumerate(timetable):
+            for p in range(PERIODS):
+                if row[p] is not None:
+                    slots_per_day[d] += 1
+                    if row[p] == subject:
+                        day_counts[d] += 1
+                        period_counts[p] += 1
+
+    # Fold the branchy per-cell scoring into two small lookup tables; the
+    # per-cell work is then table adds plus the adjacency checks, which are
+    # the only terms that depend on the cell's neighbours:
+    # - day term: favour days without the subject, then lighter days
+    #   (priorities 1 and 4)
+    # - period term: avoid repeating a period across days, prefer the
+    #   middle of the day (priorities 3 and 5)
+    day_score = [
+        (-15 if day_counts[d] == 0 else day_counts[d] * 6) + slots_per_day[d] * 0.5
+        for d in range(DAYS)
+    ]
+    period_score = [
+        period_counts[p] * 3 + _MIDDLE_PENALTY[p]
+        for p in range(PERIODS)
+    ]
 
-    # Create all possible slots
     all_slots = []
-    for d in range(DAYS):
+    jitter = _JITTER_POOL
+    jitter_offset = random.randrange(64)  # one draw per invocation
+    for d, row in enumerate(timetable):
+        base = day_score[d]
         for p in range(PERIODS):
-            if timetable[d][p] is None:  # Only consider empty slots
-                # Calculate priority score (lower is better)
-                priority = 0
-
-                # PRIORITY 1: Distribute across days (most important)
-                # Strongly prioritize days with no sessions of this subject
-                if day_counts[d] == 0:
-                    priority -= 15
-                else:
-                    # Penalize days that already have this subject
-                    priority += day_counts[d] * 6
+            if row[p] is None:  # Only consider empty slots
+                idx = d * PERIODS + p
+                priority = base + period_score[p]
 
                 # PRIORITY 2: Avoid consecutive periods
-                has_adjacent = False
-                if p > 0 and timetable[d][p - 1] == subject:
+                left_adjacent = p > 0 and row[p - 1] == subject
+                right_adjacent = p < PERIODS - 1 and row[p + 1] == subject
+                if left_adjacent:
                     priority += 4
-                    has_adjacent = True
-                if p < PERIODS - 1 and timetable[d][p + 1] == subject:
+                if right_adjacent:
                     priority += 4
-                    has_adjacent = True
-
                 # Extra penalty for being surrounded on both sides
-                if p > 0 and p < PERIODS - 1 and timetable[d][p - 1] == subject and timetable[d][p + 1] == subject:
+                if left_adjacent and right_adjacent:
                     priority += 5
 
-                # PRIORITY 3: Avoid same period across different days
-                priority += period_counts[p] * 3
-
-                # PRIORITY 4: Prefer days with fewer total sessions
-                priority += slots_per_day[d] * 0.5
-
-                # PRIORITY 5: Prefer middle periods over extremes
-                # Calculate distance from middle period (better distribution)
-                middle = PERIODS // 2
-                distance_from_middle = abs(p - middle)
-                priority += distance_from_middle * 0.2
+                # PRIORITY 6: Leave contested slots for the classes that
+                # share this teacher (least-constraining value)
+                if competition is not None:
+                    priority += competition[idx] * 2
 
                 # Add small random factor
-                priority += random.uniform(0, 1)
+                priority += jitter[jitter_offset + idx]
 
-                all_slots.append(((d, p), priority))
+                all_slots.append((idx, priority))
 
     # Sort by priority (lower is better)
     all_slots.sort(key=lambda x: x[1])
 
-    # Return just the slots
-    return [slot for slot, _ in all_slots]
+    # Return just the slot indices
+    return [idx for idx, _ in all_slots]
+
+
+def greedy_place_sessions(
+        class_timetables: Dict[str, Dict],
+        class_free_mask: Dict[str, int],
+        teacher_busy_mask: Dict[str, List[int]],
+        class_subject_teacher: Dict,
+        get_teacher_for_subject: Callable,
+        class_name: str,
+        subject: str,
+        sessions: int,
+        domain_mask: Optional[int] = None
+) -> List[Slot]:
+    """
+    Greedy first pass: walk the days from least to most loaded and take a
+    teacher-free period near the middle of the day, spreading sessions one
+    per day while possible.  Well-structured inputs place everything here
+    and never reach the backtracker.  Returns the list of slots placed so
+    the caller can undo a partial pass before falling back to the search.
+    """
+    timetable = class_timetables[class_name]["timetable"]
+    teacher_assignments = class_timetables[class_name]["teacher_assignments"][subject]
+    teacher_id = class_subject_teacher[class_name].get(subject)
+    if teacher_id is None:
+        return []
+    subject_busy_masks = teacher_busy_mask[subject]
+
+    middle = PERIODS // 2
+    day_mask_all = (1 << PERIODS) - 1
+
+    # Current per-day load and subject presence, maintained as we place
+    day_counts = [0] * DAYS
+    slots_per_day = [0] * DAYS
+    for d, row in enumerate(timetable):
+        for cell in row:
+            if cell is not None:
+                slots_per_day[d] += 1
+                if cell == subject:
+                    day_counts[d] += 1
+
+    placed: List[Slot] = []
+    for _ in range(sessions):
+        candidates = class_free_mask[class_name] & ~subject_busy_masks[teacher_id]
+        if domain_mask is not None:
+            candidates &= domain_mask
+        if not candidates:
+            break
+
+        best_slot = None
+        for d in sorted(range(DAYS), key=lambda day: (day_counts[day], slots_per_day[day])):
+            day_free = (candidates >> (d * PERIODS)) & day_mask_all
+            if not day_free:
+                continue
+            # Prefer the free period closest to the middle of the day
+            p = min(
+                (p for p in range(PERIODS) if day_free >> p & 1),
+                key=lambda period: abs(period - middle)
+            )
+            best_slot = (d, p)
+            break
+
+        if best_slot is None:
+            break
+
+        d, p = best_slot
+        bit = 1 << (d * PERIODS + p)
+        timetable[d][p] = subject
+        class_free_mask[class_name] &= ~bit
+        subject_busy_masks[teacher_id] |= bit
+        teacher_assignments[best_slot] = get_teacher_for_subject(class_name, subject, d, p, teacher_id)
+        day_counts[d] += 1
+        slots_per_day[d] += 1
+        placed.append(best_slot)
+
+    return placed
+
+
+def undo_greedy_placements(
+        class_timetables: Dict[str, Dict],
+        class_free_mask: Dict[str, int],
+        teacher_busy_mask: Dict[str, List[int]],
+        class_subject_teacher: Dict,
+        class_name: str,
+        subject: str,
+        placed: List[Slot]
+) -> None:
+    """Roll back a partial greedy pass so the backtracker starts clean."""
+    timetable = class_timetables[class_name]["timetable"]
+    teacher_assignments = class_timetables[class_name]["teacher_assignments"][subject]
+    teacher_id = class_subject_teacher[class_name][subject]
+    subject_busy_masks = teacher_busy_mask[subject]
+
+    for d, p in placed:
+        bit = 1 << (d * PERIODS + p)
+        timetable[d][p] = None
+        class_free_mask[class_name] |= bit
+        subject_busy_masks[teacher_id] &= ~bit
+        del teacher_assignments[(d, p)]
+
+
+def replicate_schedule_for_class(
+        class_timetables: Dict[str, Dict],
+        class_free_mask: Dict[str, int],
+        teacher_busy_mask: Dict[str, List[int]],
+        class_subject_teacher: Dict,
+        get_teacher_for_subject: Callable,
+        class_name: str,
+        source_class: str,
+        subject_data: Dict
+) -> bool:
+    """
+    Copy the grid of a fully scheduled class with identical subject demands
+    onto ``class_name``, giving each subject the first teacher whose busy
+    mask is clear of the copied slots.  Identical classes pose the same
+    search subproblem, so one backtracking run can serve the whole group.
+    Returns False without touching any state when some subject has no
+    conflict-free teacher left.
+    """
+    source = class_timetables[source_class]
+
+    # Pick a teacher per subject before mutating anything
+    chosen = {}
+    for subject, data in subject_data.items():
+        if data["sessions"] == 0 or data["teachers"] <= 0:
+            continue
+        slots_mask = 0
+        for d, p in source["teacher_assignments"].get(subject, {}):
+            slots_mask |= 1 << (d * PERIODS + p)
+
+        subject_busy_masks = teacher_busy_mask[subject]
+        teacher_id = next(
+            (tid for tid in range(data["teachers"])
+             if not subject_busy_masks[tid] & slots_mask),
+            None
+        )
+        if teacher_id is None:
+            return False
+        chosen[subject] = (teacher_id, slots_mask)
+
+    class_timetables[class_name]["timetable"] = [row[:] for row in source["timetable"]]
+    class_free_mask[class_name] = class_free_mask[source_class]
+    for subject, (teacher_id, slots_mask) in chosen.items():
+        teacher_busy_mask[subject][teacher_id] |= slots_mask
+        class_subject_teacher[class_name][subject] = teacher_id
+        assignments = class_timetables[class_name]["teacher_assignments"][subject]
+        for d, p in source["teacher_assignments"].get(subject, {}):
+            assignments[(d, p)] = get_teacher_for_subject(class_name, subject, d, p, teacher_id)
+    return True
 
 
 def backtrack_schedule(
         class_timetables: Dict[str, Dict],
-        teacher_assignments_global: Dict,
+        class_free_mask: Dict[str, int],
+        teacher_busy_mask: Dict[str, List[int]],
         class_subject_teacher: Dict,
         get_teacher_for_subject: Callable,
         class_name: str,
@@ -144,10 +326,19 @@ def backtrack_schedule(
         sessions_left: int,
         all_subjects: Set[str],
         max_attempts: int = 200,  # Increased max attempts
-        is_retry: bool = False  # Flag for retry attempts
+        is_retry: bool = False,  # Flag for retry attempts
+        domain_mask: Optional[int] = None,  # Pre-pruned slot domain, if any
+        pending_sessions: Optional[Dict[Tuple[str, str], int]] = None,
+        failed_states: Optional[Set[Tuple]] = None  # Memo of exhausted searches
 ) -> bool:
     """
     Enhanced backtracking algorithm with better slot selection strategy.
+
+    Free slots and teacher occupancy are tracked as 35-bit masks, so the
+    per-slot availability check is a couple of int ops instead of chained
+    dict lookups.  The search runs on an explicit depth stack (one entry
+    per session to place) instead of recursing, so no Python frames are
+    created per placement attempt.
     """
     if sessions_left == 0:
         return True
@@ -155,82 +346,195 @@ def backtrack_schedule(
     timetable = class_timetables[class_name]["timetable"]
     teacher_assignments = class_timetables[class_name]["teacher_assignments"][subject]
     teacher_id = class_subject_teacher[class_name][subject]
+    subject_busy_masks = teacher_busy_mask[subject]
+
+    # The class's free mask lives in a local for the whole search; nothing
+    # else reads this class's entry while the search runs, so it is written
+    # back to the shared dict only on exit
+    my_free = class_free_mask[class_name]
+
+    # Fail early: fewer teacher-free slots than sessions can never succeed,
+    # one popcount instead of discovering it slot by slot
+    entry_candidates = my_free & ~subject_busy_masks[teacher_id]
+    if domain_mask is not None:
+        entry_candidates &= domain_mask
+    if entry_candidates.bit_count() < sessions_left:
+        return False
+
+    # A search over the same free/busy state has already been exhausted;
+    # random jitter cannot save it, the candidate set is identical
+    state_key = None
+    if failed_states is not None:
+        state_key = (
+            class_name, subject, sessions_left, is_retry,
+            my_free & ~subject_busy_masks[teacher_id]
+        )
+        if state_key in failed_states:
+            return False
+
+    # Classes that share this subject's teacher and so compete for its slots
+    siblings = [
+        other_class
+        for other_class, subject_teachers in class_subject_teacher.items()
+        if other_class != class_name and subject_teachers.get(subject) == teacher_id
+    ]
+
+    # Count, per slot, how many sibling classes could still use it, so the
+    # sort can keep contested slots for them
+    competition = [0] * (DAYS * PERIODS)
+    for other_class in siblings:
+        contested = class_free_mask[other_class]
+        while contested:
+            bit = contested & -contested
+            contested ^= bit
+            competition[bit.bit_length() - 1] += 1
+
+    # Histograms for slot scoring, built once and then maintained by +-1
+    # on every place/unplace instead of rescanned per backtrack node
+    day_counts = [0] * DAYS
+    period_counts = [0] * PERIODS
+    slots_per_day = [0] * DAYS
+    for d, row in enumerate(timetable):
+        for p in range(PERIODS):
+            if row[p] is not None:
+                slots_per_day[d] += 1
+                if row[p] == subject:
+                    day_counts[d] += 1
+                    period_counts[p] += 1
 
-    # Get existing slots for this subject
-    existing_slots = {slot for slot in teacher_assignments.keys()}
-
-    # Sort slots optimally
-    sorted_slots = sort_slots_by_priority(timetable, subject, existing_slots)
-
-    # For retry attempts, consider all slots
-    if is_retry:
-        # Try all possible slots when in retry mode
-        all_possible_slots = []
-        for d in range(DAYS):
-            for p in range(PERIODS):
-                if timetable[d][p] is None:
-                    all_possible_slots.append((d, p))
-        # Add any missing slots to our sorted list
-        for slot in all_possible_slots:
-            if slot not in sorted_slots:
-                sorted_slots.append(slot)
-
-    # Limit attempts for efficiency but increase for difficult subjects
-    attempts = 0
-
-    for slot in sorted_slots:
-        if attempts >= max_attempts:
-            break
-
-        attempts += 1
-        d, p = slot
-
-        if timetable[d][p] is not None:
-            continue
-
-        if not is_teacher_available(teacher_assignments_global, subject, slot, teacher_id):
-            continue
+    # Running distribution score for the subject, moved by the same +-1
+    # day-count deltas, so probing a placement is arithmetic on it rather
+    # than a mutate-and-rescore of the grid
+    dist_score = sum(_score_contrib(c) for c in day_counts)
 
-        # In retry mode or for high-session subjects, be less picky about distribution
-        skip_due_to_distribution = False
-        if not is_retry:
-            # Check if placing this subject creates a better distribution
-            timetable[d][p] = subject
-            current_score = calculate_distribution_score(timetable, subject)
+    def ordered_candidate_slots() -> List[int]:
+        """Priority-ordered flat slot indices for the current grid state."""
+        sorted_slots = sort_slots_by_priority(
+            timetable, subject, competition,
+            counts=(day_counts, period_counts, slots_per_day)
+        )
+        # For retry attempts, consider all free slots, not just the sorted ones
+        if is_retry:
+            seen = set(sorted_slots)
+            for d, row in enumerate(timetable):
+                for p in range(PERIODS):
+                    if row[p] is None and d * PERIODS + p not in seen:
+                        sorted_slots.append(d * PERIODS + p)
+        return sorted_slots
+
+    # Depth stack: entry k holds [candidate iterator, attempts so far] for
+    # the k-th session; placed[k] remembers what that depth committed
+    stack = [[iter(ordered_candidate_slots()), 0]]
+    placed: List[Tuple[int, Slot]] = []
+
+    while stack:
+        depth = len(stack) - 1
+        if len(placed) > depth:
+            # Returning from a failed deeper search: undo this depth's placement
+            bit, slot = placed.pop()
+            d, p = slot
             timetable[d][p] = None
+            my_free |= bit
+            subject_busy_masks[teacher_id] &= ~bit
+            day_counts[d] -= 1
+            dist_score += -1.0 if day_counts[d] == 0 else 0.2
+            period_counts[p] -= 1
+            slots_per_day[d] -= 1
+
+        frame = stack[-1]
+        candidate_iter, attempts = frame[0], frame[1]
+
+        candidates = my_free & ~subject_busy_masks[teacher_id]
+        if domain_mask is not None:
+            candidates &= domain_mask
+
+        placed_here = False
+        # Limit attempts for efficiency but increase for difficult subjects
+        while attempts < max_attempts:
+            idx = next(candidate_iter, -1)
+            if idx < 0:
+                break
+
+            attempts += 1
+            bit = 1 << idx
+
+            if not candidates & bit:
+                continue
 
-            if current_score < 1.0 and sessions_left < 5 and attempts < max_attempts // 2:
-                # Skip this slot if it creates poor distribution and we're not desperate yet
-                skip_due_to_distribution = True
+            d, p = divmod(idx, PERIODS)
+            slot = (d, p)
 
-        if skip_due_to_distribution:
-            continue
+            # In retry mode or for high-session subjects, be less picky about distribution
+            if not is_retry:
+                # Score the placement as a delta on the running score: a day
+                # gaining its first session adds 1, a repeat day costs 0.2
+                current_score = dist_score + (1.0 if day_counts[d] == 0 else -0.2)
 
-        # Place session
-        timetable[d][p] = subject
-        teacher = get_teacher_for_subject(class_name, subject, d, p, teacher_id)
-        teacher_assignments[slot] = teacher
-        teacher_assignments_global[subject][slot][teacher_id] = class_name
+                if current_score < 1.0 and sessions_left - depth < 5 and attempts < max_attempts // 2:
+                    # Skip this slot if it creates poor distribution and we're not desperate yet
+                    continue
 
-        # Recurse
-        if backtrack_schedule(
-                class_timetables, teacher_assignments_global, class_subject_teacher,
-                get_teacher_for_subject, class_name, subject,
-                sessions_left - 1, all_subjects, max_attempts, is_retry
-        ):
-            return True
+            # Place session
+            timetable[d][p] = subject
+            my_free &= ~bit
+            subject_busy_masks[teacher_id] |= bit
+            dist_score += 1.0 if day_counts[d] == 0 else -0.2
+            day_counts[d] += 1
+            period_counts[p] += 1
+            slots_per_day[d] += 1
+
+            # Forward check: the placement must leave every pending sibling pair
+            # enough teacher-free slots for its own sessions
+            starves_sibling = False
+            if pending_sessions:
+                busy = subject_busy_masks[teacher_id]
+                for other_class in siblings:
+                    remaining = pending_sessions.get((other_class, subject), 0)
+                    if remaining and (class_free_mask[other_class] & ~busy).bit_count() < remaining:
+                        starves_sibling = True
+                        break
+            if starves_sibling:
+                timetable[d][p] = None
+                my_free |= bit
+                subject_busy_masks[teacher_id] &= ~bit
+                day_counts[d] -= 1
+                dist_score += -1.0 if day_counts[d] == 0 else 0.2
+                period_counts[p] -= 1
+                slots_per_day[d] -= 1
+                continue
 
-        # Backtrack
-        timetable[d][p] = None
-        del teacher_assignments[slot]
-        del teacher_assignments_global[subject][slot][teacher_id]
+            placed.append((bit, slot))
+            placed_here = True
+            break
 
+        frame[1] = attempts
+
+        if placed_here:
+            if len(placed) == sessions_left:
+                class_free_mask[class_name] = my_free
+                # Publish to the user-visible dict only now: failed branches
+                # never touch it, so undo is pure mask and counter work
+                for _, (d, p) in placed:
+                    teacher_assignments[(d, p)] = get_teacher_for_subject(
+                        class_name, subject, d, p, teacher_id
+                    )
+                return True
+            # Descend: open a fresh candidate ordering for the next session
+            stack.append([iter(ordered_candidate_slots()), 0])
+        else:
+            # Dead end at this depth
+            stack.pop()
+
+    class_free_mask[class_name] = my_free
+    if state_key is not None:
+        failed_states.add(state_key)
     return False
 
 
 def optimize_existing_timetable(
         class_timetables: Dict[str, Dict],
-        teacher_assignments_global: Dict,
+        class_free_mask: Dict[str, int],
+        teacher_busy_mask: Dict[str, List[int]],
         class_subject_teacher: Dict,
         get_teacher_for_subject: Callable
 ) -> bool:
@@ -243,82 +547,150 @@ def optimize_existing_timetable(
         timetable = data["timetable"]
 
         # For each subject in this class
-        for subject in data["teacher_assignments"]:
-            # Get all slots where this subject is scheduled
-            subject_slots = []
-            for d in range(DAYS):
-                for p in range(PERIODS):
-                    if timetable[d][p] == subject:
-                        subject_slots.append((d, p))
+        for subject, subject_assignments in data["teacher_assignments"].items():
+            # The assignment dict already knows where this subject is scheduled
+            subject_slots = list(subject_assignments)
 
             # Skip if fewer than 2 sessions
             if len(subject_slots) < 2:
                 continue
 
-            # Calculate current distribution score
-            current_score = calculate_distribution_score(timetable, subject)
+            # Loop invariants for this (class, subject) pair
+            teacher_id = class_subject_teacher[class_name][subject]
+            subject_busy_masks = teacher_busy_mask[subject]
+
+            # The score only depends on per-day counts, so a candidate move
+            # scores as an O(1) delta between the source and target days; no
+            # grid mutation or full rescore is needed while probing
+            day_counts = [row.count(subject) for row in timetable]
 
             # Try relocating each session
             for old_slot in subject_slots:
                 old_d, old_p = old_slot
-                teacher_id = class_subject_teacher[class_name][subject]
-                teacher = data["teacher_assignments"][subject][old_slot]
+                teacher = subject_assignments[old_slot]
+                old_bit = 1 << (old_d * PERIODS + old_p)
 
-                # Remove session temporarily
-                timetable[old_d][old_p] = None
+                # Slots free for this class where the teacher is also free
+                available = (
+                    (class_free_mask[class_name] | old_bit)
+                    & ~subject_busy_masks[teacher_id]
+                )
 
-                # Get all available slots
-                available_slots = []
-                for d in range(DAYS):
-                    for p in range(PERIODS):
-                        if timetable[d][p] is None and is_teacher_available(
-                                teacher_assignments_global, subject, (d, p), teacher_id
-                        ):
-                            available_slots.append((d, p))
+                # What leaving the source day costs, shared by all candidates
+                src_delta = _score_contrib(day_counts[old_d] - 1) - _score_contrib(day_counts[old_d])
 
                 # Try each available slot
                 best_slot = None
-                best_score = current_score
-
-                for new_slot in available_slots:
-                    if new_slot == old_slot:
+                best_delta = 0
+
+                remaining = available
+                while remaining:
+                    bit = remaining & -remaining
+                    remaining ^= bit
+                    b = bit.bit_length() - 1
+                    d, p = divmod(b, PERIODS)
+                    if d == old_d:
+                        # Moving within the same day cannot change the score
                         continue
 
-                    d, p = new_slot
-                    timetable[d][p] = subject
-                    score = calculate_distribution_score(timetable, subject)
-                    timetable[d][p] = None
-
-                    if score > best_score:
-                        best_score = score
-                        best_slot = new_slot
+                    delta = src_delta + _score_contrib(day_counts[d] + 1) - _score_contrib(day_counts[d])
+                    if delta > best_delta:
+                        best_delta = delta
+                        best_slot = (d, p)
 
                 # If found better position, move the session
-                if best_slot and best_score > current_score:
+                if best_slot:
                     d, p = best_slot
+                    new_bit = 1 << (d * PERIODS + p)
+                    timetable[old_d][old_p] = None
                     timetable[d][p] = subject
+                    day_counts[old_d] -= 1
+                    day_counts[d] += 1
 
-                    # Update teacher assignments
-                    del data["teacher_assignments"][subject][old_slot]
-                    del teacher_assignments_global[subject][old_slot][teacher_id]
+                    # Update masks and teacher assignments
+                    class_free_mask[class_name] = (class_free_mask[class_name] | old_bit) & ~new_bit
+                    subject_busy_masks[teacher_id] = (
+                        subject_busy_masks[teacher_id] & ~old_bit
+                    ) | new_bit
 
-                    data["teacher_assignments"][subject][best_slot] = teacher
-                    teacher_assignments_global[subject][best_slot][teacher_id] = class_name
+                    del subject_assignments[old_slot]
+                    subject_assignments[best_slot] = teacher
 
                     made_improvements = True
-                else:
-                    # Put back if no improvement
-                    timetable[old_d][old_p] = subject
 
     return made_improvements
 
 
+def propagate_slot_domains(
+        class_subject_data: Dict,
+        class_subject_teacher: Dict,
+        class_free_mask: Dict[str, int],
+        teacher_busy_mask: Dict[str, List[int]]
+) -> Tuple[Dict[Tuple[str, str], int], List[Tuple[str, str]]]:
+    """
+    Arc-consistency style preprocessing before backtracking.
+
+    The domain of each (class, subject) pair is the mask of slots that are
+    free for the class and for its teacher.  When a pair has exactly as many
+    domain slots as sessions to place, those slots are forced, so they are
+    removed from the domains of other classes sharing the same teacher.
+    Repeats until a fixpoint; pairs whose domain shrinks below their session
+    count are reported as infeasible without any search.
+    """
+    domains = {}
+    sessions_needed = {}
+    for class_name, subject_data in class_subject_data.items():
+        for subject, data in subject_data.items():
+            if data["sessions"] == 0:
+                continue
+            teacher_id = class_subject_teacher[class_name].get(subject)
+            if teacher_id is None:
+                # Subject was skipped during teacher assignment (no teachers)
+                continue
+            domains[(class_name, subject)] = (
+                class_free_mask[class_name] & ~teacher_busy_mask[subject][teacher_id]
+            )
+            sessions_needed[(class_name, subject)] = data["sessions"]
+
+    infeasible = []
+    queue = list(domains)
+    while queue:
+        key = queue.pop()
+        class_name, subject = key
+        domain = domains[key]
+        needed = sessions_needed[key]
+
+        if domain.bit_count() < needed:
+            if key not in infeasible:
+                infeasible.append(key)
+            continue
+
+        # A tight pair must use every slot in its domain; competitors
+        # sharing the teacher cannot have them
+        if domain.bit_count() != needed:
+            continue
+        teacher_id = class_subject_teacher[class_name][subject]
+        for other_key, other_domain in domains.items():
+            other_class, other_subject = other_key
+            if other_class == class_name or other_subject != subject:
+                continue
+            if class_subject_teacher[other_class][subject] != teacher_id:
+                continue
+            pruned = other_domain & ~domain
+            if pruned != other_domain:
+                domains[other_key] = pruned
+                queue.append(other_key)
+
+    return domains, infeasible
+
+
 def get_priority_order(class_subject_data: Dict) -> List[Tuple[str, str]]:
     """
     Determine priority order for scheduling classes and subjects:
     1. Subjects with fewer teachers get highest priority
-    2. Subjects with more sessions get higher priority
-    3. Classes with more total sessions get priority
+    2. Subjects whose teachers are shared across more classes get priority
+    3. Subjects with more sessions get higher priority
+    4. Classes with more total sessions get priority
 
     This prioritization helps tackle the most constrained subjects first.
     """
@@ -330,16 +702,24 @@ def get_priority_order(class_subject_data: Dict) -> List[Tuple[str, str]]:
         total = sum(data["sessions"] for data in subject_data.values())
         class_total_sessions[class_name] = total
 
+    # Degree heuristic: how many classes compete for each subject's teachers
+    subject_sharing = {}
+    for subject_data in class_subject_data.values():
+        for subject, data in subject_data.items():
+            if data["sessions"] > 0:
+                subject_sharing[subject] = subject_sharing.get(subject, 0) + 1
+
     # For each class, get its subjects in priority order
     for class_name, subject_data in class_subject_data.items():
         for subject, data in subject_data.items():
-            if data["sessions"] == 0:
+            if data["sessions"] == 0 or data["teachers"] <= 0:
                 continue
 
             # Modified priority: subjects with fewer teachers and more sessions come first
             # This helps ensure constrained subjects like Math and English get priority
             priority = (
                 data["teachers"],  # Lower is higher priority (fewer teachers)
+                -subject_sharing[subject],  # More classes sharing the teachers is more constrained
                 -data["sessions"],  # Negative because higher is more priority
                 -class_total_sessions[class_name],  # Negative because higher is more priority
             )
@@ -362,133 +742,256 @@ def generate_schedule_for_classes(class_subject_data, get_teacher_for_subject):
     :return: Dict[str, Dict] - class_name -> {"timetable": Timetable, "teacher_assignments": Dict}
     """
     class_timetables = {}
-    teacher_assignments_global = {}
+    class_free_mask = {}
     class_subject_teacher = {}
 
-    # Initialize timetables and teacher assignments
+    # One busy-mask list per subject, indexed by teacher id.  Sized to the
+    # largest teacher count any class declares for the subject.
+    teacher_busy_mask = {}
+    for subject_data in class_subject_data.values():
+        for subject, v in subject_data.items():
+            needed = max(1, v["teachers"])
+            current = teacher_busy_mask.setdefault(subject, [0] * needed)
+            if needed > len(current):
+                current.extend([0] * (needed - len(current)))
+
+    # Initialize timetables and free-slot masks
     for class_name, subject_data in class_subject_data.items():
-        timetable = [[None for _ in range(PERIODS)] for _ in range(DAYS)]
+        timetable = [[None] * PERIODS for _ in range(DAYS)]
         class_timetables[class_name] = {
             "timetable": timetable,
             "teacher_assignments": {subject: {} for subject, v in subject_data.items() if v["sessions"] > 0}
         }
+        class_free_mask[class_name] = FULL_MASK
 
     # Collect all subjects
     all_subjects = set()
     for subject_data in class_subject_data.values():
         all_subjects.update(subject_data.keys())
 
-    # Assign teachers more intelligently for each subject
-    for subject in all_subjects:
-        teacher_assignments_global[subject] = {(d, p): {} for d in range(DAYS) for p in range(PERIODS)}
+    # Assign teachers for each subject in a single pass over the classes,
+    # always giving the next class the least-loaded teacher in its pool
+    for class_name in class_subject_data:
+        class_subject_teacher[class_name] = {}
 
-        # Count how many classes need this subject
-        classes_needing_subject = 0
-        for class_name, subject_data in class_subject_data.items():
-            if subject in subject_data and subject_data[subject]["sessions"] > 0:
-                classes_needing_subject += 1
-
-        # Now assign teachers to minimize conflicts
+    for subject in all_subjects:
+        # How many classes each teacher of this subject is assigned to
         teacher_counts = {}
         for class_name, subject_data in class_subject_data.items():
-            if subject in subject_data and subject_data[subject]["sessions"] > 0:
-                if class_name not in class_subject_teacher:
-                    class_subject_teacher[class_name] = {}
-
-                # Get max teachers available for this subject
-                teachers = subject_data[subject]["teachers"]
-
-                # Keep track of how many classes each teacher is assigned to
-                for i in range(teachers):
-                    if i not in teacher_counts:
-                        teacher_counts[i] = 0
+            if subject not in subject_data or subject_data[subject]["sessions"] == 0:
+                continue
 
-        # Assign teachers to classes, prioritizing less used teachers
-        for class_name, subject_data in class_subject_data.items():
-            if subject in subject_data and subject_data[subject]["sessions"] > 0:
-                if subject not in class_subject_teacher[class_name]:
-                    # Find teacher with minimum assignments
-                    teachers = subject_data[subject]["teachers"]
-                    min_count = float('inf')
-                    best_teacher = 0
-
-                    for i in range(teachers):
-                        if i in teacher_counts and teacher_counts[i] < min_count:
-                            min_count = teacher_counts[i]
-                            best_teacher = i
-
-                    # Assign this teacher
-                    class_subject_teacher[class_name][subject] = best_teacher
-                    teacher_counts[best_teacher] = teacher_counts.get(best_teacher, 0) + 1
+            # Get max teachers available for this subject
+            teachers = subject_data[subject]["teachers"]
+            if teachers <= 0:
+                # No teacher pool means these sessions can never be placed;
+                # skip the assignment instead of inventing teacher 0
+                logger.warning("%s has sessions but no teachers for class %s; skipping it.", subject, class_name)
+                continue
+            for i in range(teachers):
+                if i not in teacher_counts:
+                    teacher_counts[i] = 0
+
+            # Find teacher with minimum assignments
+            min_count = float('inf')
+            best_teacher = 0
+            for i in range(teachers):
+                if teacher_counts[i] < min_count:
+                    min_count = teacher_counts[i]
+                    best_teacher = i
+
+            # Assign this teacher
+            class_subject_teacher[class_name][subject] = best_teacher
+            teacher_counts[best_teacher] = teacher_counts.get(best_teacher, 0) + 1
+
+    # Prune slot domains before searching: forced slots of tight pairs are
+    # removed from competitors, and impossible pairs surface immediately
+    domain_masks, infeasible = propagate_slot_domains(
+        class_subject_data, class_subject_teacher, class_free_mask, teacher_busy_mask
+    )
 
     # Get priority order for scheduling
     priority_order = get_priority_order(class_subject_data)
 
+    # Symmetry breaking: classes with identical subject demands pose the
+    # same search subproblem.  Schedule one representative per group and
+    # copy its grid onto the rest with a fresh teacher pick per subject.
+    signature_groups = {}
+    for class_name, subject_data in class_subject_data.items():
+        signature = frozenset(
+            (subject, data["sessions"], data["teachers"])
+            for subject, data in subject_data.items() if data["sessions"] > 0
+        )
+        signature_groups.setdefault(signature, []).append(class_name)
+
+    clone_sources = {}  # clone class -> representative of its group
+    for group in signature_groups.values():
+        for clone in group[1:]:
+            clone_sources[clone] = group[0]
+
+    if clone_sources:
+        # Stable sort: clones move last so every representative is complete
+        # before its group tries to copy it
+        priority_order.sort(key=lambda pair: pair[0] in clone_sources)
+
+    class_fully_scheduled = {class_name: True for class_name in class_subject_data}
+    replicated_classes = set()
+    replication_attempted = set()
+
     # Track failed scheduling attempts for retry
     failed_schedules = []
 
+    # Sessions still unscheduled per (class, subject); drives forward checking
+    pending_sessions = {
+        (class_name, subject): class_subject_data[class_name][subject]["sessions"]
+        for class_name, subject in priority_order
+    }
+
+    # Remember exhausted (state, sessions) searches so retries do not redo them
+    failed_states = set()
+
+    # Fail-first: the static priority order is only the tie-break.  Each
+    # iteration branches on the pair with the fewest feasible slots per
+    # session right now, so tight pairs are met while the grid is still
+    # open; clones stay deferred behind their representatives.
+    original_rank = {pair: i for i, pair in enumerate(priority_order)}
+
+    def constrainedness(pair):
+        pair_class, pair_subject = pair
+        teacher_id = class_subject_teacher[pair_class].get(pair_subject)
+        sessions = class_subject_data[pair_class][pair_subject]["sessions"]
+        if teacher_id is None or sessions == 0:
+            return (pair_class in clone_sources, float("inf"), original_rank[pair])
+        candidates = class_free_mask[pair_class] & ~teacher_busy_mask[pair_subject][teacher_id]
+        pair_domain = domain_masks.get(pair)
+        if pair_domain is not None:
+            candidates &= pair_domain
+        return (
+            pair_class in clone_sources,
+            candidates.bit_count() / sessions,
+            original_rank[pair],
+        )
+
     # First pass: Schedule all subjects
-    for class_name, subject in priority_order:
+    queue = list(priority_order)
+    while queue:
+        class_name, subject = min(queue, key=constrainedness)
+        queue.remove((class_name, subject))
+
+        if class_name in replicated_classes:
+            continue
+
+        if class_name in clone_sources and class_name not in replication_attempted:
+            replication_attempted.add(class_name)
+            source = clone_sources[class_name]
+            if class_fully_scheduled[source] and replicate_schedule_for_class(
+                class_timetables, class_free_mask, teacher_busy_mask,
+                class_subject_teacher, get_teacher_for_subject,
+                class_name, source, class_subject_data[class_name]
+            ):
+                replicated_classes.add(class_name)
+                for pair in pending_sessions:
+                    if pair[0] == class_name:
+                        pending_sessions[pair] = 0
+                continue
+
         total_sessions = class_subject_data[class_name][subject]["sessions"]
         if total_sessions == 0:
             continue
 
-        success = backtrack_schedule(
-            class_timetables, teacher_assignments_global, class_subject_teacher,
-            get_teacher_for_subject, class_name, subject,
-            total_sessions, all_subjects
+        # The pair being scheduled must not forward-check against itself
+        pending_sessions[(class_name, subject)] = 0
+
+        if (class_name, subject) in infeasible:
+            logger.warning("Not enough free slots for %s in class %s. Will retry later.", subject, class_name)
+            failed_schedules.append((class_name, subject, total_sessions))
+            class_fully_scheduled[class_name] = False
+            continue
+
+        # Greedy-first: most pairs place fully without any search
+        placed = greedy_place_sessions(
+            class_timetables, class_free_mask, teacher_busy_mask, class_subject_teacher,
+            get_teacher_for_subject, class_name, subject, total_sessions,
+            domain_mask=domain_masks.get((class_name, subject))
         )
 
+        success = len(placed) == total_sessions
+        if not success:
+            # A partial greedy pass can pin the backtracker into a corner;
+            # roll it back and let the full search start from a clean slate.
+            undo_greedy_placements(
+                class_timetables, class_free_mask, teacher_busy_mask,
+                class_subject_teacher, class_name, subject, placed
+            )
+            success = backtrack_schedule(
+                class_timetables, class_free_mask, teacher_busy_mask, class_subject_teacher,
+                get_teacher_for_subject, class_name, subject,
+                total_sessions, all_subjects,
+                domain_mask=domain_masks.get((class_name, subject)),
+                pending_sessions=pending_sessions,
+                failed_states=failed_states
+            )
+
         if not success:
-            print(f"⚠️ Warning: Could not place all {subject} sessions for class {class_name}. Will retry later.")
+            logger.warning("Could not place all %s sessions for class %s. Will retry later.", subject, class_name)
             failed_schedules.append((class_name, subject, total_sessions))
+            class_fully_scheduled[class_name] = False
 
     # Second pass: Try to optimize distributions
     for _ in range(3):  # Try optimizing a few times
         if not optimize_existing_timetable(
-                class_timetables, teacher_assignments_global, class_subject_teacher,
+                class_timetables, class_free_mask, teacher_busy_mask, class_subject_teacher,
                 get_teacher_for_subject
         ):
             break  # Stop if no improvements were made
 
     # Make space for failed schedules by removing lower priority sessions if needed
     if failed_schedules:
-        print("Attempting to resolve scheduling conflicts...")
+        logger.info("Attempting to resolve scheduling conflicts...")
         # Try to make space for failed schedules
         make_space_for_failed_schedules(
-            class_timetables, teacher_assignments_global, class_subject_teacher,
+            class_timetables, class_free_mask, teacher_busy_mask, class_subject_teacher,
             class_subject_data, failed_schedules
         )
 
         # Third pass: Retry failed schedules with relaxed constraints
         for class_name, subject, total_sessions in failed_schedules:
-            # Count how many sessions we already managed to place
-            placed_sessions = 0
-            timetable = class_timetables[class_name]["timetable"]
-            for d in range(DAYS):
-                for p in range(PERIODS):
-                    if timetable[d][p] == subject:
-                        placed_sessions += 1
+            # The assignment dict tracks exactly the sessions already placed
+            placed_sessions = len(
+                class_timetables[class_name]["teacher_assignments"].get(subject, {})
+            )
 
             remaining_sessions = total_sessions - placed_sessions
 
             if remaining_sessions > 0:
+                # Bound feasibility first: fewer teacher-free slots than
+                # sessions means the 300-attempt retry cannot succeed
+                teacher_id = class_subject_teacher[class_name].get(subject)
+                if teacher_id is None:
+                    logger.warning("Final failure: could not place all %s sessions for class %s.", subject, class_name)
+                    continue
+                feasible = class_free_mask[class_name] & ~teacher_busy_mask[subject][teacher_id]
+                if feasible.bit_count() < remaining_sessions:
+                    logger.warning("Final failure: could not place all %s sessions for class %s.", subject, class_name)
+                    continue
+
                 success = backtrack_schedule(
-                    class_timetables, teacher_assignments_global, class_subject_teacher,
+                    class_timetables, class_free_mask, teacher_busy_mask, class_subject_teacher,
                     get_teacher_for_subject, class_name, subject,
-                    remaining_sessions, all_subjects, max_attempts=300, is_retry=True
+                    remaining_sessions, all_subjects, max_attempts=300, is_retry=True,
+                    failed_states=failed_states
                 )
 
                 if not success:
-                    print(f"❌ Final failure: Could not place all {subject} sessions for class {class_name}.")
+                    logger.warning("Final failure: could not place all %s sessions for class %s.", subject, class_name)
                 else:
-                    print(f"✅ Successfully placed all remaining {subject} sessions for class {class_name} on retry.")
+                    logger.info("Placed all remaining %s sessions for class %s on retry.", subject, class_name)
 
     return class_timetables
 
 
 def make_space_for_failed_schedules(
-        class_timetables, teacher_assignments_global, class_subject_teacher,
+        class_timetables, class_free_mask, teacher_busy_mask, class_subject_teacher,
         class_subject_data, failed_schedules
 ):
     """
@@ -515,12 +1018,8 @@ def make_space_for_failed_schedules(
         timetable = class_timetables[class_name]["timetable"]
         teacher_assignments = class_timetables[class_name]["teacher_assignments"].get(subject, {})
 
-        # Find all slots where this subject is scheduled
-        subject_slots = []
-        for d in range(DAYS):
-            for p in range(PERIODS):
-                if timetable[d][p] == subject:
-                    subject_slots.append((d, p))
+        # The assignment dict already knows where this subject is scheduled
+        subject_slots = list(teacher_assignments)
 
         # Skip if fewer than 2 sessions (don't remove if there's only 1)
         if len(subject_slots) <= 1:
@@ -528,28 +1027,24 @@ def make_space_for_failed_schedules(
 
         # Remove at most one session per subject to free up space
         if subject_slots and slots_to_free > 0:
-            # Choose a slot to remove - prefer one that doesn't hurt distribution too much
+            # Choose a slot to remove - prefer one that doesn't hurt
+            # distribution too much.  Removing a session only changes its
+            # day's contribution, so rank candidates by that O(1) delta
+            # instead of mutating the grid and rescoring per slot
+            day_counts = [row.count(subject) for row in timetable]
             best_slot_to_remove = None
-            best_score_after_removal = -float('inf')
+            best_delta = -float('inf')
 
             for slot in subject_slots:
                 d, p = slot
-                # Temporarily remove this session
-                old_value = timetable[d][p]
-                timetable[d][p] = None
-
-                # Calculate distribution score without this session
-                score = calculate_distribution_score(timetable, subject)
-
-                # Restore the session
-                timetable[d][p] = old_value
-
-                if score > best_score_after_removal:
-                    best_score_after_removal = score
+                delta = _score_contrib(day_counts[d] - 1) - _score_contrib(day_counts[d])
+                if delta > best_delta:
+                    best_delta = delta
                     best_slot_to_remove = slot
 
             if best_slot_to_remove:
                 d, p = best_slot_to_remove
+                bit = 1 << (d * PERIODS + p)
 
                 # Remove this session
                 teacher_id = class_subject_teacher[class_name][subject]
@@ -558,16 +1053,16 @@ def make_space_for_failed_schedules(
                 if best_slot_to_remove in teacher_assignments:
                     # Free the slot
                     timetable[d][p] = None
+                    class_free_mask[class_name] |= bit
+                    teacher_busy_mask[subject][teacher_id] &= ~bit
                     del teacher_assignments[best_slot_to_remove]
-                    if teacher_id in teacher_assignments_global[subject][best_slot_to_remove]:
-                        del teacher_assignments_global[subject][best_slot_to_remove][teacher_id]
 
                     freed_slots.append((class_name, subject, best_slot_to_remove))
                     slots_to_free -= 1
 
-                    print(f"Temporarily removed a {subject} session from {class_name} to make space")
+                    logger.info("Temporarily removed a %s session from %s to make space", subject, class_name)
 
         if slots_to_free <= 0:
             break
 
-    return freed_slots
\ No newline at end of file
+    return freed_slots
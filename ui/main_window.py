@@ -1,13 +1,18 @@
 import logging
 import html
+from collections import defaultdict
 from typing import Any, Dict, List, Optional, Tuple
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QObject, QSignalBlocker, QThread,
+    QTimer, pyqtSignal
+)
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
-    QSpinBox, QPushButton, QTableWidget, QTableWidgetItem, QGridLayout,
-    QScrollArea, QFrame, QMessageBox, QGroupBox, QDialog, QTabWidget
+    QSpinBox, QPushButton, QTableView,
+    QGridLayout, QScrollArea, QFrame, QMessageBox, QGroupBox, QDialog,
+    QTabWidget, QStackedWidget
 )
-from functools import partial
+from functools import lru_cache
 from scheduler.scheduler import generate_schedule_for_classes
 from models.school_data import get_classes, get_subjects
 from scheduler.scheduler import PERIODS, DAYS
@@ -15,6 +20,143 @@ from PyQt5.QtWidgets import QHeaderView
 
 logging.basicConfig(level=logging.INFO)
 
+# Header labels never change, so build them once instead of re-creating
+# the lists on every table construction
+_DAY_LABELS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday")
+_PERIOD_LABELS = tuple(f"Period {i + 1}" for i in range(PERIODS))
+
+
+def _empty_grid() -> List[List[Optional[str]]]:
+    """A blank timetable grid, used before any schedule exists."""
+    return [[None] * PERIODS for _ in range(DAYS)]
+
+
+# Shared fallback for missing-subject lookups; keeps the cache build from
+# allocating a throwaway dict per cell
+_NO_SLOTS: Dict[Tuple[int, int], str] = {}
+
+
+@lru_cache(maxsize=256)
+def _teacher_str(subject: str, teacher_index: int) -> str:
+    """Teacher display string; cached since only a few pairs ever occur."""
+    return f"{subject} - T{teacher_index + 1}"
+
+
+class TimetableModel(QAbstractTableModel):
+    """Read-only model over one class's timetable grid.
+
+    Rows are days and columns periods, matching the grid the scheduler
+    returns.  A QTableView over this model paints only the visible cells
+    on demand, so no QTableWidgetItem is allocated per cell.
+    """
+
+    def __init__(self, timetable: List[List[Optional[str]]],
+                 teacher_assignments: Dict[str, Dict[Tuple[int, int], str]],
+                 parent: Optional[Any] = None) -> None:
+        super().__init__(parent)
+        self.timetable = timetable
+        self.teacher_assignments = teacher_assignments
+        self._cells = self._build_cell_texts()
+
+    def _build_cell_texts(self) -> Dict[Tuple[int, int], str]:
+        """Format every occupied cell once per schedule swap.
+
+        data() is called on every repaint, so it reads a flat slot->text
+        map instead of redoing the nested subject/teacher lookups.
+        """
+        cells = {}
+        for day, row in enumerate(self.timetable):
+            for period, subject in enumerate(row):
+                if subject:
+                    teacher = self.teacher_assignments.get(subject, _NO_SLOTS).get(
+                        (day, period), "Unknown"
+                    )
+                    cells[(day, period)] = f"{subject}\n{teacher}"
+        return cells
+
+    def set_schedule(self, timetable: List[List[Optional[str]]],
+                     teacher_assignments: Dict[str, Dict[Tuple[int, int], str]]) -> None:
+        """Swap in a newly generated schedule and refresh the view."""
+        self.beginResetModel()
+        self.timetable = timetable
+        self.teacher_assignments = teacher_assignments
+        self._cells = self._build_cell_texts()
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return DAYS
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return PERIODS
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole:
+            return self._cells.get((index.row(), index.column()))
+        elif role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return _PERIOD_LABELS[section]
+            return f"Day {section + 1}"
+        return None
+
+
+class TransposedTimetableModel(TimetableModel):
+    """Viewer orientation: periods as rows and weekdays as columns.
+
+    The grid and assignment data are shared with TimetableModel; indexes
+    are swapped and delegated rather than duplicating the cell logic.
+    """
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return PERIODS
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return DAYS
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        return super().data(self.createIndex(index.column(), index.row()), role)
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return _DAY_LABELS[section]
+            return _PERIOD_LABELS[section]
+        return None
+
+
+class ScheduleWorker(QObject):
+    """Runs schedule generation off the GUI thread.
+
+    The solver can take seconds on tight inputs; running it here keeps the
+    window responsive and reports back through signals.
+    """
+
+    finished = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, class_subject_data: Dict[str, Any],
+                 get_teacher_for_subject: Any) -> None:
+        super().__init__()
+        self.class_subject_data = class_subject_data
+        self.get_teacher_for_subject = get_teacher_for_subject
+
+    def run(self) -> None:
+        try:
+            result = generate_schedule_for_classes(
+                self.class_subject_data, self.get_teacher_for_subject
+            )
+        except Exception as e:
+            logging.error("Schedule generation failed", exc_info=True)
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(result)
+
 
 class TimetableViewerWindow(QDialog):
     def __init__(self, parent: Optional[QWidget] = None, class_timetables: Optional[Dict[str, Any]] = None) -> None:
@@ -30,15 +172,21 @@ class TimetableViewerWindow(QDialog):
         self.tab_widget = QTabWidget()
         self.tab_widget.setTabPosition(QTabWidget.North)
 
+        # Tabs start as empty pages; each table is built the first time
+        # its tab is shown, so opening the dialog costs one table no
+        # matter how many classes there are
+        self._pending_tabs: Dict[int, Tuple[str, Dict[str, Any]]] = {}
         for class_name, data in self.class_timetables.items():
             if not isinstance(data, dict) or "timetable" not in data:
                 continue
 
             tab = QWidget()
-            tab_layout = QVBoxLayout(tab)
-            table = self.create_timetable_for_class(class_name, data)
-            tab_layout.addWidget(table)
-            self.tab_widget.addTab(tab, f"Class {class_name}")
+            QVBoxLayout(tab)
+            index = self.tab_widget.addTab(tab, f"Class {class_name}")
+            self._pending_tabs[index] = (class_name, data)
+
+        self.tab_widget.currentChanged.connect(self._ensure_tab_built)
+        self._ensure_tab_built(self.tab_widget.currentIndex())
 
         layout.addWidget(self.tab_widget)
 
@@ -47,46 +195,50 @@ class TimetableViewerWindow(QDialog):
         close_button.setFixedSize(150, 50)
         layout.addWidget(close_button, alignment=Qt.AlignCenter)
 
-    def create_timetable_for_class(self, class_name: str, data: Dict[str, Any]) -> QTableWidget:
-        table = QTableWidget(PERIODS, DAYS)
-        table.setHorizontalHeaderLabels(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"])
-        table.setVerticalHeaderLabels([f"Period {i + 1}" for i in range(PERIODS)])
-
-        table.setMinimumHeight(700)
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
-
-        for c in range(DAYS):
-            table.setColumnWidth(c, 200)
-        for r in range(PERIODS):
-            table.setRowHeight(r, 80)
+    def _ensure_tab_built(self, index: int) -> None:
+        """Materialize the selected tab's table on first display."""
+        pending = self._pending_tabs.pop(index, None)
+        if pending is None:
+            return
+        class_name, data = pending
+        table = self.create_timetable_for_class(class_name, data)
+        self.tab_widget.widget(index).layout().addWidget(table)
+
+    def create_timetable_for_class(self, class_name: str, data: Dict[str, Any]) -> QTableView:
+        # A view over the shared model: no per-cell items to allocate or
+        # fill, cells are rendered straight from the grid on paint
+        view = QTableView()
+        model = TransposedTimetableModel(
+            data["timetable"], data.get("teacher_assignments", {}), view
+        )
+        view.setModel(model)
 
-        timetable = data["timetable"]
-        teacher_assignments = data.get("teacher_assignments", {})
+        view.setMinimumHeight(700)
 
-        for day in range(DAYS):
-            for period in range(PERIODS):
-                subject = timetable[day][period]
-                if subject:
-                    teacher = "Unknown"
-                    if subject in teacher_assignments and (day, period) in teacher_assignments[subject]:
-                        teacher = teacher_assignments[subject][(day, period)]
+        # One font on the view covers every cell
+        font = view.font()
+        font.setPointSize(12)
+        view.setFont(font)
 
-                    item = QTableWidgetItem(f"{subject}\n{teacher}")
-                    item.setTextAlignment(Qt.AlignCenter)
-                    font = item.font()
-                    font.setPointSize(12)
-                    item.setFont(font)
-                    table.setItem(period, day, item)
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        view.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
-        return table
+        return view
 
 
 class MainWindow(QWidget):
     def __init__(self) -> None:
         super().__init__()
-        self.classes = get_classes()
-        self.subjects = get_subjects()
+        # Fixed for the window's lifetime; tuples make that explicit and
+        # keep the iteration cheap in the loops below
+        self.classes = tuple(get_classes())
+        self.subjects = tuple(get_subjects())
+
+        # Names never change, so escape them for the info HTML once here
+        # instead of on every label rebuild
+        self._safe_names: Dict[str, str] = {
+            name: html.escape(name) for name in self.classes + self.subjects
+        }
 
         # Spinboxes for sessions (per class) and teachers (global)
         self.session_spins: Dict[str, QSpinBox] = {}
@@ -104,6 +256,32 @@ class MainWindow(QWidget):
         }
 
         self.class_timetables: Dict[str, Any] = {}
+
+        # Models backing the displayed tables, keyed by class; built once
+        # in init_ui so a regeneration swaps contents, never widgets
+        self._class_models: Dict[str, TimetableModel] = {}
+
+        # Stack of per-class timetable pages, built in init_ui; only the
+        # selected class's table is laid out and painted
+        self._class_stack: Optional[QStackedWidget] = None
+
+        # Mirrors the combo's selection; refreshed by load_class_settings
+        self._current_class = self.classes[0]
+
+        # Coalesces bursts of spinbox changes into one info rebuild
+        self._info_update_pending = False
+
+        # Running per-class session totals, moved by deltas on each spinbox
+        # change instead of re-summed over every subject
+        self._class_total_sessions: Dict[str, int] = {
+            class_name: 0 for class_name in self.classes
+        }
+
+        # The info label is rebuilt only when settings changed or another
+        # class was selected since it was last rendered
+        self._class_info_dirty = True
+        self._class_info_class: Optional[str] = None
+
         self.init_ui()
 
     def init_ui(self) -> None:
@@ -137,14 +315,19 @@ class MainWindow(QWidget):
             session_spin = QSpinBox()
             session_spin.setRange(0, 10)
             session_spin.setValue(0)
-            session_spin.valueChanged.connect(partial(self.on_session_spin_changed, subject))
+            # Only emit once a typed value is committed, not per keystroke
+            session_spin.setKeyboardTracking(False)
+            session_spin.setProperty("subject", subject)
+            session_spin.valueChanged.connect(self.on_session_spin_changed)
             self.session_spins[subject] = session_spin
 
             # Teacher spinbox (global)
             teacher_spin = QSpinBox()
             teacher_spin.setRange(1, 5)
             teacher_spin.setValue(1)
-            teacher_spin.valueChanged.connect(partial(self.on_teacher_spin_changed, subject))
+            teacher_spin.setKeyboardTracking(False)
+            teacher_spin.setProperty("subject", subject)
+            teacher_spin.valueChanged.connect(self.on_teacher_spin_changed)
             self.teacher_spins[subject] = teacher_spin
 
             self.subject_layout.addWidget(label, i + 1, 0)
@@ -173,6 +356,7 @@ class MainWindow(QWidget):
         self.class_combo = QComboBox()
         self.class_combo.addItems(self.classes)
         self.class_combo.currentTextChanged.connect(self.load_class_settings)
+        self.class_combo.currentIndexChanged.connect(self.show_selected_class_page)
         class_selector.addWidget(self.class_combo)
         class_layout.addLayout(class_selector)
 
@@ -207,6 +391,28 @@ class MainWindow(QWidget):
         # --- Timetable display area ---
         self.timetable_area = QScrollArea()
         self.timetable_area.setWidgetResizable(True)
+
+        # The pages, group boxes and views are permanent; regeneration only
+        # swaps data into the models, so redisplay cost is independent of
+        # widget construction
+        stack = QStackedWidget()
+        for class_name in self.classes:
+            group = QGroupBox(f"Timetable for {class_name}")
+            group_layout = QVBoxLayout()
+
+            view = QTableView()
+            model = TimetableModel(_empty_grid(), {}, view)
+            view.setModel(model)
+            view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            view.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            group_layout.addWidget(view)
+            self._class_models[class_name] = model
+
+            group.setLayout(group_layout)
+            stack.addWidget(group)
+
+        self._class_stack = stack
+        self.timetable_area.setWidget(stack)
         layout.addWidget(self.timetable_area)
 
         self.setLayout(layout)
@@ -214,39 +420,62 @@ class MainWindow(QWidget):
 
     def load_class_settings(self, class_name: str) -> None:
         """Load the selected class's session settings into the UI."""
+        # Remember the selection so per-keystroke slots avoid a combo
+        # round-trip for the same string
+        self._current_class = class_name
+        sessions = self.class_subject_sessions[class_name]
         for subject in self.subjects:
-            # Update session spinbox with class-specific value
-            self.session_spins[subject].blockSignals(True)
-            self.session_spins[subject].setValue(self.class_subject_sessions[class_name][subject])
-            self.session_spins[subject].blockSignals(False)
-
-            # Update teacher spinbox with global value
-            self.teacher_spins[subject].blockSignals(True)
-            self.teacher_spins[subject].setValue(self.global_subject_teachers[subject])
-            self.teacher_spins[subject].blockSignals(False)
+            # Touch a spinbox only when its value actually differs; most
+            # switches between classes leave many rows unchanged
+            spin = self.session_spins[subject]
+            if spin.value() != sessions[subject]:
+                with QSignalBlocker(spin):
+                    spin.setValue(sessions[subject])
+
+            # Teacher counts are global and rarely change between classes
+            spin = self.teacher_spins[subject]
+            if spin.value() != self.global_subject_teachers[subject]:
+                with QSignalBlocker(spin):
+                    spin.setValue(self.global_subject_teachers[subject])
 
         self.update_class_info()
 
-    def on_session_spin_changed(self, subject: str) -> None:
+    def on_session_spin_changed(self, sessions: int) -> None:
         """Update the selected class's session count for the subject."""
-        class_name = self.class_combo.currentText()
-        self.class_subject_sessions[class_name][subject] = self.session_spins[subject].value()
-        self.update_class_info()
-
-    def on_teacher_spin_changed(self, subject: str) -> None:
+        subject = self.sender().property("subject")
+        class_name = self._current_class
+        self._class_total_sessions[class_name] += sessions - self.class_subject_sessions[class_name][subject]
+        self.class_subject_sessions[class_name][subject] = sessions
+        self._class_info_dirty = True
+        self.schedule_class_info_update()
+
+    def on_teacher_spin_changed(self, teachers: int) -> None:
         """Update the global teacher count for the subject."""
-        self.global_subject_teachers[subject] = self.teacher_spins[subject].value()
+        subject = self.sender().property("subject")
+        self.global_subject_teachers[subject] = teachers
+        self._class_info_dirty = True
+        self.schedule_class_info_update()
+
+    def schedule_class_info_update(self) -> None:
+        """Rebuild the class info once per event-loop batch of changes."""
+        if self._info_update_pending:
+            return
+        self._info_update_pending = True
+        QTimer.singleShot(0, self._flush_class_info_update)
+
+    def _flush_class_info_update(self) -> None:
+        self._info_update_pending = False
         self.update_class_info()
 
     def apply_settings_to_all_classes(self) -> None:
         """Copy the current class's session settings to all other classes."""
-        current_class = self.class_combo.currentText()
+        current_class = self._current_class
+        current_sessions = self.class_subject_sessions[current_class]
         for other_class in self.classes:
             if other_class != current_class:
-                for subject in self.subjects:
-                    self.class_subject_sessions[other_class][subject] = (
-                        self.class_subject_sessions[current_class][subject]
-                    )
+                self.class_subject_sessions[other_class].update(current_sessions)
+                self._class_total_sessions[other_class] = self._class_total_sessions[current_class]
+        self._class_info_dirty = True
         QMessageBox.information(
             self,
             "Settings Applied",
@@ -254,43 +483,63 @@ class MainWindow(QWidget):
         )
 
     def generate_all_schedules(self) -> None:
-        """Generate schedules using current settings."""
-        try:
-            # Build input data structure
-            class_subject_data = {
-                class_name: {
-                    subject: {
-                        "sessions": self.class_subject_sessions[class_name][subject],
-                        "teachers": self.global_subject_teachers[subject]
-                    }
-                    for subject in self.subjects
+        """Generate schedules on a worker thread using current settings."""
+        # Build input data structure
+        class_subject_data = {
+            class_name: {
+                subject: {
+                    "sessions": self.class_subject_sessions[class_name][subject],
+                    "teachers": self.global_subject_teachers[subject]
                 }
-                for class_name in self.classes
+                for subject in self.subjects
             }
+            for class_name in self.classes
+        }
 
-            # Generate schedules
-            self.class_timetables = generate_schedule_for_classes(
-                class_subject_data,
-                self.get_teacher_for_subject
+        # Run the solver off the GUI thread; the button stays disabled
+        # until the worker reports back
+        self.generate_button.setEnabled(False)
+
+        self._worker = ScheduleWorker(class_subject_data, self.get_teacher_for_subject)
+        self._worker_thread = QThread(self)
+        self._worker.moveToThread(self._worker_thread)
+
+        self._worker_thread.started.connect(self._worker.run)
+        self._worker.finished.connect(self.on_schedules_ready)
+        self._worker.failed.connect(self.on_schedule_error)
+        self._worker.finished.connect(self._worker_thread.quit)
+        self._worker.failed.connect(self._worker_thread.quit)
+        self._worker_thread.finished.connect(self._worker.deleteLater)
+        self._worker_thread.finished.connect(self._worker_thread.deleteLater)
+
+        self._worker_thread.start()
+
+    def on_schedules_ready(self, class_timetables: Dict[str, Any]) -> None:
+        """Display the schedules produced by the worker thread."""
+        self.class_timetables = class_timetables
+        self.generate_button.setEnabled(True)
+
+        self.display_all_timetables()
+        self.view_button.setEnabled(True)
+
+        # Check for overlaps
+        overlaps = self.check_for_overlaps()
+        if overlaps:
+            # Built as a list + join; += on a str re-copies the prefix on
+            # every conflict line
+            parts = ["Teacher overlaps found:\n"]
+            parts.extend(
+                f"{_DAY_LABELS[day]}, Period {period + 1}: {', '.join(classes)}\n"
+                for day, period, classes in overlaps
             )
+            QMessageBox.warning(self, "Scheduling Conflicts", "".join(parts))
+        else:
+            QMessageBox.information(self, "Success", "Schedules generated successfully with no conflicts!")
 
-            # Display results
-            self.display_all_timetables()
-            self.view_button.setEnabled(True)
-
-            # Check for overlaps
-            overlaps = self.check_for_overlaps()
-            if overlaps:
-                msg = "Teacher overlaps found:\n"
-                for day, period, classes in overlaps:
-                    msg += f"Day {day + 1}, Period {period + 1}: {', '.join(classes)}\n"
-                QMessageBox.warning(self, "Scheduling Conflicts", msg)
-            else:
-                QMessageBox.information(self, "Success", "Schedules generated successfully with no conflicts!")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to generate schedules: {str(e)}")
-            logging.error("Schedule generation failed", exc_info=True)
+    def on_schedule_error(self, message: str) -> None:
+        """Report a failed generation run."""
+        self.generate_button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Failed to generate schedules: {message}")
 
     def count_sessions_per_class(self) -> Dict[str, int]:
         """
@@ -299,106 +548,80 @@ class MainWindow(QWidget):
         Returns:
             Dict[str, int]: Dictionary mapping class names to their total session count
         """
-        session_counts = {}
-        for class_name in self.classes:
-            total_sessions = sum(
-                self.class_subject_sessions[class_name][subject]
-                for subject in self.subjects
-            )
-            session_counts[class_name] = total_sessions
-        return session_counts
+        return dict(self._class_total_sessions)
 
     def update_class_info(self) -> None:
         """Update the class info display with session counts."""
-        class_name = self.class_combo.currentText()
-        info_lines = [f"<b>Class {html.escape(class_name)} Settings</b><br>"]
+        class_name = self._current_class
+
+        # Unchanged settings and same class: the rendered HTML is still valid
+        if not self._class_info_dirty and class_name == self._class_info_class:
+            return
+
+        info_lines = [f"<b>Class {self._safe_names[class_name]} Settings</b><br>"]
 
         # Show total sessions for this class
-        total_sessions = sum(
-            self.class_subject_sessions[class_name][subject]
-            for subject in self.subjects
-        )
+        total_sessions = self._class_total_sessions[class_name]
         info_lines.append(f"<b>Total Sessions: {total_sessions}</b><br><br>")
 
-        # Show sessions (class-specific) and teachers (global)
+        # Show sessions (class-specific) and teachers (global); bind the
+        # maps once rather than re-resolving the attributes per subject
+        session_map = self.class_subject_sessions[class_name]
+        teacher_map = self.global_subject_teachers
         for subject in self.subjects:
-            sessions = self.class_subject_sessions[class_name][subject]
+            sessions = session_map[subject]
             if sessions > 0:
-                teachers = self.global_subject_teachers[subject]
-                safe_subject = html.escape(subject)
                 info_lines.append(
-                    f"• {safe_subject}: {sessions} sessions (class-specific), "
-                    f"{teachers} teacher(s) (global)<br>"
+                    f"• {self._safe_names[subject]}: {sessions} sessions (class-specific), "
+                    f"{teacher_map[subject]} teacher(s) (global)<br>"
                 )
 
         # Show all class totals
         info_lines.append("<br><b>All Class Totals:</b><br>")
         session_counts = self.count_sessions_per_class()
         for cls, count in session_counts.items():
-            info_lines.append(f"• {html.escape(cls)}: {count} sessions<br>")
+            info_lines.append(f"• {self._safe_names[cls]}: {count} sessions<br>")
 
         self.class_info.setText(''.join(info_lines))
+        self._class_info_class = class_name
+        self._class_info_dirty = False
 
     def display_all_timetables(self) -> None:
-        """Display generated timetables in the scroll area."""
-        container = QWidget()
-        layout = QVBoxLayout()
-
-        for class_name, data in self.class_timetables.items():
-            group = QGroupBox(f"Timetable for {class_name}")
-            group_layout = QVBoxLayout()
-
+        """Push the generated timetables into the per-class models."""
+        for class_name, model in self._class_models.items():
+            data = self.class_timetables.get(class_name)
             if isinstance(data, dict) and "timetable" in data:
-                table = QTableWidget(DAYS, PERIODS)
-                table.setHorizontalHeaderLabels([f"Period {i + 1}" for i in range(PERIODS)])
-                table.setVerticalHeaderLabels([f"Day {i + 1}" for i in range(DAYS)])
-
-                timetable = data["timetable"]
-                teacher_assignments = data.get("teacher_assignments", {})
-
-                for d in range(DAYS):
-                    for p in range(PERIODS):
-                        subject = timetable[d][p]
-                        if subject:
-                            teacher = "Unknown"
-                            if subject in teacher_assignments and (d, p) in teacher_assignments[subject]:
-                                teacher = teacher_assignments[subject][(d, p)]
-                            item = QTableWidgetItem(f"{subject}\n{teacher}")
-                            table.setItem(d, p, item)
-
-                table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-                table.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
-                group_layout.addWidget(table)
-
-            group.setLayout(group_layout)
-            layout.addWidget(group)
+                model.set_schedule(data["timetable"], data.get("teacher_assignments", {}))
+            else:
+                model.set_schedule(_empty_grid(), {})
 
-        container.setLayout(layout)
-        self.timetable_area.setWidget(container)
+    def show_selected_class_page(self, index: int) -> None:
+        """Switch the displayed timetable to the newly selected class."""
+        if self._class_stack is not None:
+            self._class_stack.setCurrentIndex(index)
 
     def check_for_overlaps(self) -> List[Tuple[int, int, List[str]]]:
         """Check for teacher assignment overlaps."""
+        # The assignment dicts already map each occupied slot to its
+        # teacher, so one pass over them groups classes per (slot, teacher)
+        # directly; the old scan probed every grid cell of every class for
+        # all 35 slots, mostly hitting empty cells
+        slot_teacher_classes: Dict[Tuple[int, int], Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        for class_name, data in self.class_timetables.items():
+            if not (isinstance(data, dict) and "timetable" in data):
+                continue
+            for assignments in data.get("teacher_assignments", {}).values():
+                for slot, teacher in assignments.items():
+                    slot_teacher_classes[slot][teacher].append(class_name)
+
+        # Sorting by slot and teacher keeps the report order stable across
+        # regenerations; the grouping itself cannot produce duplicates
         overlaps = []
-        for day in range(DAYS):
-            for period in range(PERIODS):
-                teacher_classes = {}
-                for class_name, data in self.class_timetables.items():
-                    if isinstance(data, dict) and "timetable" in data:
-                        subject = data["timetable"][day][period]
-                        if subject:
-                            teacher = None
-                            if (subject in data.get("teacher_assignments", {}) and
-                                    (day, period) in data["teacher_assignments"][subject]):
-                                teacher = data["teacher_assignments"][subject][(day, period)]
-
-                            if teacher:
-                                if teacher not in teacher_classes:
-                                    teacher_classes[teacher] = []
-                                teacher_classes[teacher].append(class_name)
-
-                for teacher, classes in teacher_classes.items():
-                    if len(classes) > 1:
-                        overlaps.append((day, period, classes))
+        for slot in sorted(slot_teacher_classes):
+            for teacher in sorted(slot_teacher_classes[slot]):
+                classes = slot_teacher_classes[slot][teacher]
+                if len(classes) > 1:
+                    overlaps.append((slot[0], slot[1], classes))
 
         return overlaps
 
@@ -411,7 +634,7 @@ class MainWindow(QWidget):
             teacher_index: int
     ) -> str:
         """Generate teacher identifier string."""
-        return f"{subject} - T{teacher_index + 1}"
+        return _teacher_str(subject, teacher_index)
 
     def open_timetable_viewer(self) -> None:
         """Open the timetable viewer window."""
@@ -425,6 +648,7 @@ class MainWindow(QWidget):
     def clear_timetables(self) -> None:
         """Clear all generated timetables."""
         self.class_timetables.clear()
-        self.timetable_area.setWidget(QWidget())
+        # Blank the persistent models rather than tearing down the pages
+        self.display_all_timetables()
         self.view_button.setEnabled(False)
         QMessageBox.information(self, "Cleared", "All timetables have been cleared.")
\ No newline at end of file